@@ -2,10 +2,17 @@ from collections import defaultdict, deque
 from math import radians, sin, cos, sqrt, atan2
 import csv
 
-from numpy import stack
+import numpy as np
 from graph.airport import Airport
 import os
 
+EARTH_RADIUS_KM = 6371.0
+AIRPORT_COLUMNS = ('code', 'name', 'city', 'country', 'latitude', 'longitude')
+ROUTE_COLUMNS = ('source', 'destination', 'weight')
+# Claves src_<campo>/dst_<campo> -> "Source Airport Code", "Destination Airport Latitude", ...
+DEFAULT_CSV_COLUMNS = {f'{side}_{field}': f'{prefix} Airport {field.capitalize()}' for side, prefix in (('src', 'Source'), ('dst', 'Destination')) for field in AIRPORT_COLUMNS}
+COLUMNAR_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
 class Graph:
     def __init__(self):
         self.vertices = {}
@@ -20,9 +27,19 @@ class Graph:
             if not any(v == code2 for v, _ in self.adj_list[code1]):
                 self.adj_list[code1].append((code2, weight))
                 self.adj_list[code2].append((code1, weight))
+
+    def add_routes(self, codes1, codes2, weights):
+        # Inserción en bloque: las rutas existentes se consultan en un conjunto en vez de recorrer la lista de adyacencia
+        existing = {(u, v) for u, neighbors in self.adj_list.items() for v, _ in neighbors}
+        for code1, code2, weight in zip(codes1, codes2, weights):
+            if code1 in self.vertices and code2 in self.vertices and (code1, code2) not in existing:
+                self.adj_list[code1].append((code2, weight))
+                self.adj_list[code2].append((code1, weight))
+                existing.add((code1, code2))
+                existing.add((code2, code1))
     
     def haversine_distance(self, lat1, lon1, lat2, lon2):
-        R = 6371.0
+        R = EARTH_RADIUS_KM
         lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
         dlat = lat2 - lat1
         dlon = lon2 - lon1
@@ -31,21 +48,35 @@ class Graph:
         dis = 2 * R * atan2(sqrt(a), sqrt(1 - a))
         return dis
     
-    def load_from_csv(self, filename: str):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        src_dir = os.path.abspath(os.path.join(current_dir, ".."))
-        dataset_path = os.path.join(src_dir, "dataset", filename)
+    def resolve_dataset_path(self, filename: str, dataset_dir: str = None):
+        if dataset_dir is None:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            dataset_dir = os.path.abspath(os.path.join(current_dir, "..", "dataset"))
+        return os.path.join(dataset_dir, filename)
+
+    def load_from_csv(self, filename: str, dataset_dir: str = None, columns: dict = None, chunksize: int = None):
+        dataset_path = self.resolve_dataset_path(filename, dataset_dir)
+        cols = {**DEFAULT_CSV_COLUMNS, **(columns or {})}
 
         if not os.path.exists(dataset_path):
             raise FileNotFoundError(f"No se encontró el archivo CSV en: {dataset_path}")
 
         print(f"[INFO] Cargando datos desde: {dataset_path}")
 
+        if chunksize:
+            # Lectura por bloques con pandas para archivos que no caben en memoria. Las columnas de texto se leen
+            # como str sin conversión a NaN para obtener el mismo grafo que csv.DictReader
+            import pandas as pd
+            text_columns = [cols[f'{side}_{field}'] for side in ('src', 'dst') for field in AIRPORT_COLUMNS[:4]]
+            for chunk in pd.read_csv(dataset_path, usecols=list(cols.values()), dtype=dict.fromkeys(text_columns, str), keep_default_na=False, chunksize=chunksize, encoding='utf-8'):
+                self.load_flights_frame(chunk, cols)
+            return self
+
         with open(dataset_path, encoding='utf-8') as file:
             reader = csv.DictReader(file)
             for row in reader:
-                src = Airport(row['Source Airport Code'], row['Source Airport Name'], row['Source Airport City'], row['Source Airport Country'], float(row['Source Airport Latitude']), float(row['Source Airport Longitude']))
-                dst = Airport(row['Destination Airport Code'], row['Destination Airport Name'], row['Destination Airport City'], row['Destination Airport Country'], float(row['Destination Airport Latitude']), float(row['Destination Airport Longitude']))
+                src = Airport(*(row[cols[f'src_{field}']] for field in AIRPORT_COLUMNS))
+                dst = Airport(*(row[cols[f'dst_{field}']] for field in AIRPORT_COLUMNS))
                 self.add_airport(src)
                 self.add_airport(dst)
                 distance = self.haversine_distance(src.latitude, src.longitude, dst.latitude, dst.longitude)
@@ -53,6 +84,194 @@ class Graph:
 
         return self
 
+    def load_flights_frame(self, frame, columns: dict = None):
+        import pandas as pd
+        cols = {**DEFAULT_CSV_COLUMNS, **(columns or {})}
+
+        # Origen y destino intercalados por fila, para que el primer registro de cada código sea el mismo que en load_from_csv
+        fields = {field: np.column_stack([frame[cols[f'src_{field}']].to_numpy(), frame[cols[f'dst_{field}']].to_numpy()]).ravel() for field in AIRPORT_COLUMNS}
+        first = ~pd.Series(fields['code']).str.strip().str.upper().duplicated().to_numpy()
+        for values in zip(*(fields[field][first] for field in AIRPORT_COLUMNS)):
+            self.add_airport(Airport(*values))
+
+        # Distancias de todo el bloque calculadas de forma vectorizada
+        lat1, lon1, lat2, lon2 = (np.radians(frame[cols[c]].to_numpy(dtype=float)) for c in ('src_latitude', 'src_longitude', 'dst_latitude', 'dst_longitude'))
+        a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+        distances = 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        src_codes = frame[cols['src_code']].str.strip().str.upper()
+        dst_codes = frame[cols['dst_code']].str.strip().str.upper()
+        self.add_routes(src_codes, dst_codes, distances.tolist())
+
+        return self
+
+    def to_columns(self):
+        airports = list(self.vertices.values())
+        edges = self.get_edges()
+        airport_columns = {
+            "code": [a.code for a in airports],
+            "name": [a.name for a in airports],
+            "city": [a.city for a in airports],
+            "country": [a.country for a in airports],
+            "latitude": np.array([a.latitude for a in airports], dtype=np.float64),
+            "longitude": np.array([a.longitude for a in airports], dtype=np.float64),
+        }
+        route_columns = {
+            "source": [u for u, _, _ in edges],
+            "destination": [v for _, v, _ in edges],
+            "weight": np.array([w for _, _, w in edges], dtype=np.float64),
+        }
+        return airport_columns, route_columns
+
+    def from_columns(self, airport_columns: dict, route_columns: dict):
+        for values in zip(*(airport_columns[field] for field in AIRPORT_COLUMNS)):
+            self.add_airport(Airport(*values))
+
+        # Los pesos ya vienen calculados, no se recalcula la distancia
+        self.add_routes(*(route_columns[field] for field in ROUTE_COLUMNS[:2]), (float(w) for w in route_columns['weight']))
+
+        return self
+
+    def export_columnar(self, filename: str, fmt: str = "parquet", dataset_dir: str = None):
+        base_path = self.resolve_dataset_path(filename, dataset_dir)
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+        airport_columns, route_columns = self.to_columns()
+
+        if fmt == "npz":
+            path = base_path if base_path.endswith(".npz") else base_path + ".npz"
+            arrays = {f"airport_{k}": np.asarray(v, dtype=str) if isinstance(v, list) else v for k, v in airport_columns.items()}
+            arrays.update({f"route_{k}": np.asarray(v, dtype=str) if isinstance(v, list) else v for k, v in route_columns.items()})
+            np.savez(path, **arrays)
+            print(f"[INFO] Grafo exportado en: {path}")
+            return [path]
+
+        if fmt not in COLUMNAR_EXTENSIONS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Se requiere pyarrow para exportar a Parquet/Arrow") from e
+
+        paths = []
+        for table_name, columns in (("airports", airport_columns), ("routes", route_columns)):
+            table = pa.table({k: pa.array(v) for k, v in columns.items()})
+            path = f"{base_path}_{table_name}{COLUMNAR_EXTENSIONS[fmt]}"
+            if fmt == "parquet":
+                pq.write_table(table, path)
+            else:
+                with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            paths.append(path)
+
+        print(f"[INFO] Grafo exportado en: {', '.join(paths)}")
+        return paths
+
+    def load_columnar(self, filename: str, fmt: str = "parquet", dataset_dir: str = None, columns: dict = None):
+        base_path = self.resolve_dataset_path(filename, dataset_dir)
+        cols = {field: field for field in AIRPORT_COLUMNS + ROUTE_COLUMNS}
+        cols.update(columns or {})
+
+        # Solo se leen las columnas del mapeo. Las coordenadas y pesos se mantienen como arreglos de NumPy,
+        # pero el grafo se materializa igualmente como objetos Airport y listas de adyacencia
+        if fmt == "npz":
+            path = base_path if base_path.endswith(".npz") else base_path + ".npz"
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No se encontró el archivo en: {path}")
+            print(f"[INFO] Cargando datos desde: {path}")
+            # NpzFile descomprime cada arreglo solo al accederlo
+            with np.load(path, allow_pickle=False) as data:
+                tables = {}
+                for prefix, fields in (("airport", AIRPORT_COLUMNS), ("route", ROUTE_COLUMNS)):
+                    arrays = {field: data[f"{prefix}_{cols[field]}"] for field in fields}
+                    tables[prefix] = {field: arr if arr.dtype.kind == 'f' else arr.tolist() for field, arr in arrays.items()}
+            return self.from_columns(tables["airport"], tables["route"])
+
+        if fmt not in COLUMNAR_EXTENSIONS:
+            raise ValueError(f"Formato no soportado: {fmt}")
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Se requiere pyarrow para cargar Parquet/Arrow") from e
+
+        tables = {}
+        for table_name, fields in (("airports", AIRPORT_COLUMNS), ("routes", ROUTE_COLUMNS)):
+            path = f"{base_path}_{table_name}{COLUMNAR_EXTENSIONS[fmt]}"
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No se encontró el archivo en: {path}")
+            print(f"[INFO] Cargando datos desde: {path}")
+            names = [cols[field] for field in fields]
+            if fmt == "parquet":
+                table = pq.read_table(path, columns=names, memory_map=True)
+            else:
+                with pa.memory_map(path, "r") as source:
+                    table = pa.ipc.open_file(source).read_all().select(names)
+            tables[table_name] = {}
+            for field, name in zip(fields, names):
+                column = table.column(name)
+                tables[table_name][field] = column.to_numpy() if pa.types.is_floating(column.type) else column.to_pylist()
+
+        return self.from_columns(tables["airports"], tables["routes"])
+
+    def get_edges(self):
+        edges = []
+        seen = set()
+
+        for u in self.vertices:
+            for v, weight in self.adj_list[u]:
+                edge_key = tuple(sorted([u, v]))
+                if edge_key not in seen:
+                    seen.add(edge_key)
+                    edges.append((u, v, weight))
+
+        return edges
+
+    def great_circle_segments(self, edges, step_degrees=5.0):
+        # Retorna (points, offsets): points es un arreglo (P, 2) de pares [lat, lon] y la ruta i
+        # ocupa points[offsets[i]:offsets[i + 1]]. Las rutas cortas usan 2 puntos y las largas
+        # un punto cada step_degrees de arco
+        if not edges:
+            return np.empty((0, 2)), np.zeros(1, dtype=np.int64)
+
+        # Vectores unitarios de cada aeropuerto, calculados una sola vez
+        index = {code: i for i, code in enumerate(self.vertices)}
+        lat, lon = np.radians(np.array([[a.latitude, a.longitude] for a in self.vertices.values()], dtype=float)).T
+        unit = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+        p1 = unit[np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))]
+        p2 = unit[np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))]
+        omega = np.arccos(np.clip(np.sum(p1 * p2, axis=1), -1.0, 1.0))
+
+        counts = np.maximum(np.ceil(omega / np.radians(step_degrees)), 1).astype(np.int64) + 1
+        offsets = np.zeros(len(edges) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        edge_idx = np.repeat(np.arange(len(edges)), counts)
+        t = (np.arange(offsets[-1]) - offsets[edge_idx]) / (counts[edge_idx] - 1)
+
+        omega = omega[edge_idx]
+        sin_omega = np.sin(omega)
+        # Rutas de longitud casi nula: se usa interpolación lineal para no dividir entre cero
+        degenerate = sin_omega < 1e-12
+        safe_sin = np.where(degenerate, 1.0, sin_omega)
+        a = np.where(degenerate, 1.0 - t, np.sin((1.0 - t) * omega) / safe_sin)
+        b = np.where(degenerate, t, np.sin(t * omega) / safe_sin)
+
+        points = a[:, None] * p1[edge_idx] + b[:, None] * p2[edge_idx]
+        lat = np.arctan2(points[:, 2], np.hypot(points[:, 0], points[:, 1]))
+        lon = np.arctan2(points[:, 1], points[:, 0])
+
+        # Se desenvuelve la longitud dentro de cada ruta para que las que cruzan el antimeridiano
+        # no atraviesen el mapa
+        jump = np.zeros_like(lon)
+        jump[1:] = -2 * np.pi * np.round(np.diff(lon) / (2 * np.pi))
+        jump[offsets[:-1]] = 0.0
+        shift = np.cumsum(jump)
+        lon = lon + shift - np.repeat(shift[offsets[:-1]], counts)
+
+        return np.degrees(np.stack([lat, lon], axis=-1)), offsets
+
     def bfs(self, start_code, visited):
         q = deque([start_code])
         component = []
@@ -111,16 +330,7 @@ class Graph:
 
     
     def kruskal(self):
-        edges = []
-        seen = set()
-
-        for u in self.vertices:
-            for v, weight in self.adj_list[u]:
-                edge_key = tuple(sorted([u, v]))
-                if edge_key not in seen:
-                    seen.add(edge_key)
-                    edges.append((weight, u, v))
-
+        edges = [(weight, u, v) for u, v, weight in self.get_edges()]
         edges.sort()
         parent = {}
         rank = {}
@@ -160,6 +370,7 @@ class Graph:
         results = []
 
         for i, component in enumerate(components, start=1):
+            component = set(component)
             subgraph = Graph()
             for vertex in component:
                 subgraph.add_airport(self.vertices[vertex])
@@ -1,12 +1,57 @@
 import folium
 import os
+from branca.element import MacroElement
+from jinja2 import Template
+
+
+class RoutesLayer(MacroElement):
+    # Dibuja las rutas de un archivo routes.js reconstruyendo las polilíneas desde los buffers binarios
+    _template = Template("""
+        {% macro header(this, kwargs) %}
+            <script src="{{ this.src }}"></script>
+        {% endmacro %}
+        {% macro script(this, kwargs) %}
+            (function() {
+                function decode(b64, Type) {
+                    var bin = atob(b64);
+                    var bytes = new Uint8Array(bin.length);
+                    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+                    return new Type(bytes.buffer);
+                }
+                var renderer = L.canvas();
+                ROUTE_LAYERS.forEach(function(layer) {
+                    var coords = decode(layer.coords, Float32Array);
+                    var offsets = decode(layer.offsets, Int32Array);
+                    var lines = new Array(offsets.length - 1);
+                    for (var k = 0; k < lines.length; k++) {
+                        var line = [];
+                        for (var p = offsets[k]; p < offsets[k + 1]; p++) line.push([coords[2 * p], coords[2 * p + 1]]);
+                        lines[k] = line;
+                    }
+                    L.polyline(lines, {color: layer.color, weight: {{ this.weight }}, opacity: {{ this.opacity }}, renderer: renderer})
+                        .bindTooltip("Componente " + layer.componente + ": " + layer.rutas + " rutas")
+                        .addTo({{ this._parent.get_name() }});
+                });
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, src, weight, opacity):
+        super().__init__()
+        self._name = "RoutesLayer"
+        self.src = src
+        self.weight = weight
+        self.opacity = opacity
+
 
 class GraphController:
     def __init__(self, graph):
         self.graph = graph
         self.selected_airports = []
+        self.mst_edges = None
     
     def load_data(self):
+        self.mst_edges = None
         self.graph.load_from_csv("flights_final.csv")
     
     def check_connectivity(self):
@@ -25,9 +70,11 @@ class GraphController:
     def get_mst_weight(self):
         if self.graph.is_connected():
             edges, total_weight = self.graph.kruskal()
+            self.mst_edges = edges
             return total_weight
         else:
             results = self.graph.kruskal_por_componentes()
+            self.mst_edges = [edge for item in results for edge in item["Rutas"]]
             peso_global = sum(item["Peso total"] for item in results)
             return {"Componentes": results, "Peso total global": peso_global}
 
@@ -182,3 +229,96 @@ class GraphController:
         map_path = os.path.join(output_dir, "map.html")
         m.save(map_path)
         return map_path
+
+    def _routes_payload(self, groups):
+        import base64
+        palette = ["#e6194b", "#3cb44b", "#4363d8", "#f58231", "#911eb4", "#42d4f4", "#f032e6", "#9a6324", "#800000", "#000075"]
+        layers = []
+        groups = [(component_id, edges) for component_id, edges in groups if edges]
+
+        # Se interpolan todas las rutas de una vez y luego se separan por componente
+        all_points, all_offsets = self.graph.great_circle_segments([edge for _, edges in groups for edge in edges])
+        first = 0
+
+        for component_id, edges in groups:
+            last = first + len(edges)
+            offsets = all_offsets[first:last + 1]
+            points = all_points[offsets[0]:offsets[-1]]
+            offsets = offsets - offsets[0]
+            first = last
+            # Coordenadas y offsets van como buffers binarios (Float32/Int32) codificados en base64
+            layers.append({
+                "componente": component_id,
+                "rutas": len(edges),
+                "color": palette[(component_id - 1) % len(palette)],
+                "coords": base64.b64encode(points.astype("<f4").tobytes()).decode("ascii"),
+                "offsets": base64.b64encode(offsets.astype("<i4").tobytes()).decode("ascii")
+            })
+
+        return layers
+
+    def _routes_map(self, groups, weight=1.5, opacity=0.6):
+        import folium
+        import json
+        import os
+        import time
+
+        if not self.graph.vertices:
+            print("[ERROR] No hay aeropuertos cargados.")
+            return None
+
+        if not any(edges for _, edges in groups):
+            print("[INFO] No hay rutas para dibujar.")
+            return None
+
+        latitudes = [a.latitude for a in self.graph.vertices.values()]
+        longitudes = [a.longitude for a in self.graph.vertices.values()]
+        center_lat = sum(latitudes) / len(latitudes)
+        center_lon = sum(longitudes) / len(longitudes)
+
+        output_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output"))
+        os.makedirs(output_dir, exist_ok=True)
+        map_path = os.path.join(output_dir, "map.html")
+
+        # Las rutas se escriben en un archivo aparte que carga el mapa, en lugar de incrustarlas en el HTML
+        routes_path = os.path.join(output_dir, "routes.js")
+        with open(routes_path, "w", encoding="utf-8") as file:
+            file.write("var ROUTE_LAYERS = ")
+            json.dump(self._routes_payload(groups), file)
+            file.write(";\n")
+
+        # Canvas en lugar de SVG: una sola capa para miles de segmentos
+        m = folium.Map(location=[center_lat, center_lon], zoom_start=3, prefer_canvas=True)
+        RoutesLayer(f"routes.js?v={int(time.time())}", weight, opacity).add_to(m)
+
+        m.save(map_path)
+        return map_path
+
+    def _group_by_component(self, edges):
+        components = self.graph.get_connected_components()
+        component_of = {}
+        for i, comp in enumerate(components, start=1):
+            for code in comp:
+                component_of[code] = i
+
+        grouped = {i: [] for i in range(1, len(components) + 1)}
+        for u, v, weight in edges:
+            grouped[component_of[u]].append((u, v, weight))
+
+        return list(grouped.items())
+
+    def show_mst(self):
+        # Se reutiliza el MST ya calculado por get_mst_weight; kruskal() da el bosque si el grafo es disconexo
+        if self.mst_edges is None:
+            self.mst_edges, _ = self.graph.kruskal()
+
+        map_path = self._routes_map(self._group_by_component(self.mst_edges), weight=2.5, opacity=0.9)
+        if map_path:
+            print(f"[INFO] Mapa del MST generado en: {map_path}")
+        return map_path
+
+    def show_route_network(self):
+        map_path = self._routes_map(self._group_by_component(self.graph.get_edges()))
+        if map_path:
+            print(f"[INFO] Mapa de la red de rutas generado en: {map_path}")
+        return map_path
@@ -32,6 +32,8 @@ class Interface(QMainWindow):
         self.btn_conexidad.clicked.connect(self.check_conexity)
         self.btn_mst = QPushButton("Peso de MST")
         self.btn_mst.clicked.connect(self.calculate_mst)
+        self.btn_red = QPushButton("Red de rutas")
+        self.btn_red.clicked.connect(self.show_route_network)
 
         self.input_buscar = QLineEdit()
         self.input_buscar.setPlaceholderText("Buscar aeropuerto")
@@ -54,6 +56,7 @@ class Interface(QMainWindow):
 
         sidebar.addWidget(self.btn_conexidad)
         sidebar.addWidget(self.btn_mst)
+        sidebar.addWidget(self.btn_red)
         sidebar.addSpacing(20)
         sidebar.addWidget(self.input_buscar)
         sidebar.addWidget(self.btn_buscar)
@@ -109,11 +112,27 @@ class Interface(QMainWindow):
             else:
                 QMessageBox.warning(self, "Error", "Formato de resultado inesperado del MST.")
                 print("[ERROR] Tipo de retorno inesperado en get_mst_weight")
+                return
+
+            map_path = self.controller.show_mst()
+            if map_path:
+                self.load_map(map_path)
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error al calcular el árbol de expansión mínima: {e}")
             print(f"[ERROR] Error al calcular MST: {e}")
     
+    def show_route_network(self):
+        try:
+            map_path = self.controller.show_route_network()
+            if map_path:
+                self.load_map(map_path)
+            else:
+                QMessageBox.information(self, "Red de rutas", "No hay rutas para mostrar.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error al generar la red de rutas: {e}")
+            print(f"[ERROR] Error al generar la red de rutas: {e}")
+
     def search_airport(self):
         code = self.input_buscar.text()
         airport = self.controller.search_airport(code)